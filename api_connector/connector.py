@@ -8,12 +8,18 @@ import aioify
 from httpx import AsyncClient, Response
 from httpx._models import URL  # noqa
 from fastapi import status, HTTPException
+from pydantic import ValidationError
 from starlette.responses import StreamingResponse
 
 from api_connector.utils import ProtocolTypeEnum
+from localized_exceptions import error_collector
+from localized_exceptions.localized_exception import UserListHttpException
 
 logger = getLogger()
 
+# keys of UserExceptionSchema, other 4xx details (ex: fastapi 422) are skipped
+USER_ERROR_KEYS = frozenset(('value', 'type', 'loc', 'localize'))
+
 
 class AsyncInternalAPIConnector:
     """
@@ -26,14 +32,17 @@ class AsyncInternalAPIConnector:
             protocol: ProtocolTypeEnum = ProtocolTypeEnum.HTTP,
             port: Optional[int] = None,
             http2: bool = True,
-            request_timeout: int = 30
+            request_timeout: int = 30,
+            limits: Optional[httpx.Limits] = None
     ):
         self.request_timeout = request_timeout
         self.protocol = protocol
         self.http2 = http2
         self.host = host
         self.port = port
+        self.limits = limits
         self._url = self._form_url()
+        self._client: Optional[AsyncClient] = None
 
         self.__post = aioify.aioify(httpx.post)
         self.__get = aioify.aioify(httpx.get)
@@ -42,7 +51,81 @@ class AsyncInternalAPIConnector:
 
     def _form_url(self) -> str:
         """Url forming"""
-        return f'{self.protocol}://{self.host}:{self.port}' if self.port else f'{self.protocol}://{self.host}'  # noqa
+        # plain string protocols are accepted too
+        protocol = str(getattr(self.protocol, 'value', self.protocol)).lower()
+        return f'{protocol}://{self.host}:{self.port}' if self.port else f'{protocol}://{self.host}'  # noqa
+
+    async def __aenter__(self) -> 'AsyncInternalAPIConnector':
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    @property
+    def is_open(self) -> bool:
+        return self._client is not None
+
+    async def open(self) -> None:
+        """
+        Open connection pool shared by all requests of connector
+        Without it every request opens its own connection
+        """
+        if self._client is not None:
+            return
+
+        self._client = AsyncClient(
+            http2=self.http2,
+            timeout=self.request_timeout,
+            limits=self.limits if self.limits else httpx.Limits()
+        )
+        self.__post = self._cookies_to_headers(self._client.post)
+        self.__get = self._cookies_to_headers(self._client.get)
+        self.__put = self._cookies_to_headers(self._client.put)
+        self.__delete = self._cookies_to_headers(self._client.delete)
+
+    @staticmethod
+    def _cookies_to_headers(method):
+        """Per request cookies are deprecated for httpx clients, send them in Cookie header"""
+        async def request(*args, cookies: Optional[dict] = None, headers: Optional[dict] = None, **kwargs):
+            if cookies:
+                headers = dict(headers) if headers else dict()
+                cookie = '; '.join(f'{name}={value}' for name, value in cookies.items())
+                headers['Cookie'] = f"{headers['Cookie']}; {cookie}" if headers.get('Cookie') else cookie
+            return await method(*args, headers=headers, **kwargs)
+        return request
+
+    async def close(self) -> None:
+        """Close connection pool"""
+        if self._client is None:
+            return
+
+        client, self._client = self._client, None
+        self.__post = aioify.aioify(httpx.post)
+        self.__get = aioify.aioify(httpx.get)
+        self.__put = aioify.aioify(httpx.put)
+        self.__delete = aioify.aioify(httpx.delete)
+        await client.aclose()
+
+    async def warmup(self, path: str = '/', connections: int = 1, timeout: float = 2) -> None:
+        """
+        Resolve host and open pool connections (with TLS handshake) before first requests
+        Warmup errors are logged only and requests wait timeout seconds at most,
+        so service can start while upstream is unavailable
+
+        http2 is negotiated over HTTPS only and multiplexes all requests in one
+        connection, so then a single connection is warmed whatever connections is
+        """
+        await self.open()
+        if self.http2 and self._url.startswith('https://'):
+            connections = min(connections, 1)
+        results = await asyncio.gather(
+            *[self._client.head(self._url + path, timeout=timeout) for _ in range(connections)],
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning(f'Connector warmup for {self._url} failed: {result!r}')
 
     async def post(
             self,
@@ -161,6 +244,78 @@ class AsyncInternalAPIConnector:
             responses: Union[BaseException, Any] = await asyncio.gather(*request_tasks)
         return responses
 
+    @staticmethod
+    def merge_errors(
+            *,
+            responses: List[Response],
+            errors: Optional[UserListHttpException] = None,
+            paths: Optional[List[Union[str, list, None]]] = None,
+            trusted: bool = True
+    ) -> bool:
+        """
+        Merge localized errors from client error responses in one pass
+        Errors go to the errors list or to the active UserErrorCollector,
+        paths are prefixes for each response in responses order
+
+        Details from internal services are trusted and merged without validation,
+        responses without localized errors (ex: fastapi 422) are skipped
+
+        Using:
+            responses = await connect.bunch(requests=[...])
+            errors = UserListHttpException(status_code=status.HTTP_400_BAD_REQUEST)
+            if connect.merge_errors(responses=responses, errors=errors, paths=['company', 'place']):
+                errors.prepare_exception()
+                raise errors
+        """
+        if paths is not None and len(paths) != len(responses):
+            raise ValueError(f'Got {len(paths)} paths for {len(responses)} responses')
+
+        merged = False
+        for index, response in enumerate(responses):
+            if not status.HTTP_400_BAD_REQUEST <= response.status_code < status.HTTP_500_INTERNAL_SERVER_ERROR:
+                continue
+
+            try:
+                detail = response.json()
+            except ValueError:
+                logger.warning(f'Bad error body in response from {AsyncInternalAPIConnector._response_url(response)}')
+                continue
+
+            # errors raised by the service handler are wrapped in detail
+            if isinstance(detail, dict):
+                detail = detail.get('detail', detail)
+            if isinstance(detail, dict):
+                detail = [detail]
+            if not detail or not isinstance(detail, list) \
+                    or not all(isinstance(x, dict) and USER_ERROR_KEYS <= x.keys() for x in detail):
+                continue
+
+            path = paths[index] if paths else None
+            try:
+                if errors is not None:
+                    errors.merge_details(detail=detail, path_pre=path, trusted=trusted)
+                else:
+                    error_collector.merge_errors(
+                        detail=detail,
+                        path_pre=[path] if isinstance(path, str) else path,
+                        trusted=trusted
+                    )
+            except ValidationError as exc:
+                logger.warning(
+                    f'Bad localized errors in response from {AsyncInternalAPIConnector._response_url(response)}: {exc}'
+                )
+                continue
+            merged = True
+        return merged
+
+    @staticmethod
+    def _response_url(response: Response) -> str:
+        """Url for logs, response built without request has no url"""
+        try:
+            return str(response.url)
+        except RuntimeError:
+            return '<unknown>'
+
     async def get_file(
             self,
             path: str = None,
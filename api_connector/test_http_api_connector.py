@@ -9,6 +9,8 @@ from fastapi import status
 
 from api_connector.connector import AsyncInternalAPIConnector
 from api_connector.utils import RequestTypeEnum, ProtocolTypeEnum
+from localized_exceptions.error_collector import UserErrorCollector
+from localized_exceptions.localized_exception import UserListHttpException
 
 
 @pytest.fixture(scope='session')
@@ -198,3 +200,97 @@ async def test_put_with_string_params(api_connector):
     assert response.status_code == 200
 
 # TODO add tests for file
+
+
+def test_merge_errors():
+    error = {
+        'value': 1,
+        'type': 'VALIDATION',
+        'loc': ['category_id'],
+        'localize': {'EN': 'Product category not found'}
+    }
+    responses = [
+        Response(status_code=status.HTTP_400_BAD_REQUEST, json={'detail': [error, error]}),
+        Response(status_code=status.HTTP_200_OK, json=[error]),
+        Response(status_code=status.HTTP_404_NOT_FOUND, json={'detail': error}),
+    ]
+    errors = UserListHttpException(status_code=status.HTTP_400_BAD_REQUEST)
+    assert AsyncInternalAPIConnector.merge_errors(
+        responses=responses,
+        errors=errors,
+        paths=['company', 'skipped', ['places', 0]]
+    )
+    assert len(errors.get_details()) == 3
+    assert errors.get_details()[0].loc == ['company', 'category_id']
+    assert errors.get_details()[2].loc == ['places', 0, 'category_id']
+
+
+def test_merge_errors_to_collector():
+    error = {
+        'value': 1,
+        'type': 'VALIDATION',
+        'loc': ['category_id'],
+        'localize': {'EN': 'Product category not found'}
+    }
+    responses = [Response(status_code=status.HTTP_400_BAD_REQUEST, json={'detail': [error]})]
+    with pytest.raises(UserListHttpException) as exc_info:
+        with UserErrorCollector(status_code=status.HTTP_400_BAD_REQUEST):
+            AsyncInternalAPIConnector.merge_errors(responses=responses, paths=['company'])
+    assert exc_info.value.detail[0]['loc'] == ['company', 'category_id']
+
+
+def test_merge_errors_skip_not_localized():
+    error = {
+        'value': 1,
+        'type': 'VALIDATION',
+        'loc': ['category_id'],
+        'localize': {'EN': 'Product category not found'}
+    }
+    fastapi_error = {'type': 'missing', 'loc': ['body', 'name'], 'msg': 'Field required'}
+    bad_error = {'value': 1, 'type': 'UNKNOWN', 'loc': ['name'], 'localize': {'EN': 'Unknown'}}
+    responses = [
+        Response(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, json={'detail': [fastapi_error]}),
+        Response(status_code=status.HTTP_400_BAD_REQUEST, json={'detail': [bad_error]}),
+        Response(status_code=status.HTTP_400_BAD_REQUEST, content=b'not json'),
+        Response(status_code=status.HTTP_400_BAD_REQUEST, json={'detail': [error]}),
+    ]
+    errors = UserListHttpException(status_code=status.HTTP_400_BAD_REQUEST)
+    assert AsyncInternalAPIConnector.merge_errors(responses=responses, errors=errors)
+    assert len(errors.get_details()) == 1
+
+
+def test_merge_errors_paths_length():
+    with pytest.raises(ValueError):
+        AsyncInternalAPIConnector.merge_errors(
+            responses=[Response(status_code=status.HTTP_200_OK), Response(status_code=status.HTTP_200_OK)],
+            paths=['company']
+        )
+
+
+@pytest.mark.asyncio
+async def test_pooled_cookies_to_headers():
+    async def request(*args, **kwargs):
+        return kwargs
+
+    method = AsyncInternalAPIConnector._cookies_to_headers(request)
+    kwargs = await method('/get', cookies={'a': 1, 'b': 2}, headers={'Cookie': 'c=3'})
+    assert 'cookies' not in kwargs
+    assert kwargs['headers']['Cookie'] == 'c=3; a=1; b=2'
+    assert (await method('/get'))['headers'] is None
+
+
+def test_form_url_string_protocol():
+    assert AsyncInternalAPIConnector(host='places', protocol=ProtocolTypeEnum.HTTPS)._url == 'https://places'
+    assert AsyncInternalAPIConnector(host='places', protocol='http', port=8000)._url == 'http://places:8000'
+
+
+@pytest.mark.asyncio
+async def test_warmup_timeout():
+    # non routable address drops connections silently
+    connector = AsyncInternalAPIConnector(host='10.255.255.1', request_timeout=30)
+    start = time.perf_counter()
+    try:
+        await connector.warmup(connections=2, timeout=0.1)
+    finally:
+        await connector.close()
+    assert time.perf_counter() - start < 5
@@ -10,3 +10,4 @@ class RequestTypeEnum(str, Enum):
 
 class ProtocolTypeEnum(str, Enum):
     HTTP = "HTTP"
+    HTTPS = "HTTPS"
@@ -0,0 +1,47 @@
+"""
+Benchmarks (tests with benchmark fixture) run only with --benchmark-only,
+the default run checks correctness only
+
+Regression check against saved run, fails on BENCHMARK_COMPARE_FAIL:
+    pytest --benchmark-only --benchmark-save=baseline
+    pytest --benchmark-only --benchmark-compare
+"""
+import tracemalloc
+
+import pytest
+
+# allowed slowdown against compared run, used when --benchmark-compare-fail is not set
+BENCHMARK_COMPARE_FAIL = ('mean:25%',)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    if not config.pluginmanager.hasplugin('benchmark'):
+        return
+    from pytest_benchmark.utils import parse_compare_fail
+
+    if config.getoption('benchmark_compare') and not config.getoption('benchmark_compare_fail'):
+        config.option.benchmark_compare_fail = [parse_compare_fail(expr) for expr in BENCHMARK_COMPARE_FAIL]
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('benchmark_only', default=False):
+        return
+    skip = pytest.mark.skip(reason='Benchmarks run only with --benchmark-only')
+    for item in items:
+        if 'benchmark' in getattr(item, 'fixturenames', ()):
+            item.add_marker(skip)
+
+
+@pytest.fixture()
+def peak_memory():
+    """Peak of allocated memory in bytes for single call of function"""
+    def measure(func, *args, **kwargs) -> int:
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return peak
+    return measure
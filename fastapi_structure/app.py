@@ -0,0 +1,167 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Union
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from api_connector.connector import AsyncInternalAPIConnector
+from fastapi_structure.profiling import (
+    EXCEPTIONS,
+    ProfileSink,
+    TimingMiddleware,
+    TimingStats,
+    instrument_connector,
+    logging_profile_sink,
+    timed
+)
+from fastapi_structure.response_cache import (
+    MemoryCacheBackend,
+    ResponseCacheMiddleware,
+    SqliteCacheBackend
+)
+from fastapi_structure.utils import AppConfig, ConnectorConfig
+from fastapi_structure.workers import WorkerStatsSchema, per_worker, worker_stats
+from localized_exceptions.localized_exception import UserHttpException, UserListHttpException
+
+
+def create_connector(config: ConnectorConfig) -> AsyncInternalAPIConnector:
+    """
+    Create connector from config
+    Pool with total_connections gets its share for worker, see launcher
+    """
+    max_connections = config.max_connections
+    max_keepalive_connections = config.max_keepalive_connections
+    if config.total_connections:
+        max_connections = per_worker(config.total_connections)
+        if max_keepalive_connections:
+            max_keepalive_connections = min(max_keepalive_connections, max_connections)
+
+    return AsyncInternalAPIConnector(
+        host=config.host,
+        protocol=config.protocol,
+        port=config.port,
+        http2=config.http2,
+        request_timeout=config.request_timeout,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+    )
+
+
+async def user_exception_handler(
+        request: Request,
+        exc: Union[UserHttpException, UserListHttpException]
+) -> JSONResponse:
+    """
+    Handler for localized exceptions
+    UserListHttpException can be raised without prepare_exception call
+    """
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={'detail': jsonable_encoder(exc.detail)},
+        headers=exc.headers
+    )
+
+
+def create_app(
+        config: AppConfig,
+        *,
+        profile_sink: ProfileSink = logging_profile_sink,
+        **kwargs
+) -> FastAPI:
+    """
+    Application factory
+    Connectors from config are opened once at startup, warmed and closed on shutdown,
+    all requests share their connection pools
+
+    With profiling config requests are timed by TimingMiddleware,
+    histograms are in app.state.timing_stats
+
+    With response cache config responses of endpoints marked with cached decorator
+    are cached, cache backend for invalidation is in app.state.response_cache
+
+    With worker stats path resource usage of worker is served on it
+
+    Using:
+        app = create_app(AppConfig(connectors=[ConnectorConfig(name='places', host='places')]))
+
+        @app.get('/company/{company_id}')
+        async def get_company(
+                company_id: int,
+                places: AsyncInternalAPIConnector = Depends(get_connector('places'))
+        ):
+            return (await places.get(f'/places/company/{company_id}')).json()
+    """
+    connectors: Dict[str, AsyncInternalAPIConnector] = {
+        connector_config.name: create_connector(connector_config)
+        for connector_config in config.connectors
+    }
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await asyncio.gather(*[connector.open() for connector in connectors.values()])
+        if config.warmup:
+            await asyncio.gather(*[
+                connectors[connector_config.name].warmup(
+                    path=connector_config.warmup_path,
+                    connections=connector_config.warmup_connections,
+                    timeout=connector_config.warmup_timeout
+                )
+                for connector_config in config.connectors
+                if connector_config.warmup_connections
+            ])
+        try:
+            yield
+        finally:
+            await asyncio.gather(*[connector.close() for connector in connectors.values()])
+
+    app = FastAPI(title=config.title, lifespan=lifespan, **kwargs)
+    app.state.connectors = connectors
+    exception_handler = user_exception_handler
+
+    if config.response_cache:
+        if config.response_cache.path:
+            app.state.response_cache = SqliteCacheBackend(config.response_cache.path)
+        else:
+            app.state.response_cache = MemoryCacheBackend(config.response_cache.max_size)
+        app.add_middleware(
+            ResponseCacheMiddleware,
+            backend=app.state.response_cache,
+            max_body_size=config.response_cache.max_body_size
+        )
+
+    # added last to be the outer middleware and time cache hits too
+    if config.profiling:
+        app.state.timing_stats = TimingStats()
+        app.add_middleware(
+            TimingMiddleware,
+            stats=app.state.timing_stats,
+            slow_threshold=config.profiling.slow_threshold,
+            profile_sample_rate=config.profiling.profile_sample_rate,
+            profile_sink=profile_sink,
+            profile_limit=config.profiling.profile_limit
+        )
+        for connector in connectors.values():
+            instrument_connector(connector)
+        exception_handler = timed(EXCEPTIONS, user_exception_handler)
+
+    if config.worker_stats_path:
+        @app.get(config.worker_stats_path, response_model=WorkerStatsSchema, include_in_schema=False)
+        def get_worker_stats():
+            # sync endpoint runs in threadpool, reading smaps grows with process size
+            return worker_stats(connectors)
+
+    app.add_exception_handler(UserHttpException, exception_handler)
+    app.add_exception_handler(UserListHttpException, exception_handler)
+    return app
+
+
+def get_connector(name: str) -> Callable[[Request], AsyncInternalAPIConnector]:
+    """Dependency for shared connector by name from config"""
+    def dependency(request: Request) -> AsyncInternalAPIConnector:
+        return request.app.state.connectors[name]
+    return dependency
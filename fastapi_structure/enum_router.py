@@ -0,0 +1,132 @@
+import json
+import hashlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+
+from localized_enum.localized_enum import LocalizedEnum
+
+ALL_LOCALES = None
+
+# bulk payloads for other names combinations are built on each request above it
+MAX_BULK_PAYLOADS = 1024
+
+
+def _encode(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def _etag(*parts: bytes) -> str:
+    return '"' + hashlib.blake2b(b'\x00'.join(parts), digest_size=16).hexdigest() + '"'
+
+
+class LocalizedEnumRouter(APIRouter):
+    """
+    Router with reference data endpoints for LocalizedEnum classes
+    Payloads are encoded once per enum and locale, responses have strong ETag
+    and Cache-Control, requests with matching If-None-Match get 304
+
+    Routes:
+        GET {prefix}/{enum_name}?locale=EN  - single enum object list
+        GET {prefix}?names=A&names=B&locale=EN  - bulk object lists by enum name, all enums without names
+
+    Using:
+        app.include_router(LocalizedEnumRouter(enums=[UserExceptionTypeEnum, ProductExceptionEnum]))
+    """
+
+    def __init__(
+            self,
+            enums: Iterable[Type[LocalizedEnum]],
+            *,
+            prefix: str = '/enums',
+            max_age: int = 3600,
+            **kwargs
+    ):
+        super().__init__(prefix=prefix, **kwargs)
+        self.cache_control = f'public, max-age={max_age}'
+        self.enums: Dict[str, Type[LocalizedEnum]] = dict()
+        for enum_class in enums:
+            if enum_class.__name__ in self.enums:
+                raise ValueError(f'Duplicate enum name {enum_class.__name__}')
+            self.enums[enum_class.__name__] = enum_class
+        self.locales = sorted({
+            locale
+            for enum_class in self.enums.values()
+            for member in enum_class
+            for locale in (member.localize or ())
+        })
+        # (enum name, locale) -> (encoded payload, etag)
+        self._payloads: Dict[Tuple[str, Optional[str]], Tuple[bytes, str]] = dict()
+        for name, enum_class in self.enums.items():
+            for locale in [ALL_LOCALES, *self.locales]:
+                body = _encode(self._object_list(enum_class, locale))
+                self._payloads[name, locale] = body, _etag(body)
+        # (enum names, locale) -> (encoded bulk payload, etag), all enums are encoded here
+        self._bulk_payloads: Dict[Tuple[Tuple[str, ...], Optional[str]], Tuple[bytes, str]] = dict()
+        for locale in [ALL_LOCALES, *self.locales]:
+            self._bulk_payload(tuple(self.enums), locale)
+
+        self.add_api_route('', self.get_enums, methods=['GET'])
+        self.add_api_route('/{name}', self.get_enum, methods=['GET'])
+
+    @staticmethod
+    def _object_list(enum_class: Type[LocalizedEnum], locale: Optional[str]) -> List[dict]:
+        object_list = enum_class.to_object_list()
+        if locale is ALL_LOCALES:
+            return object_list
+        for enum_object in object_list:
+            localize = enum_object['localize']
+            if localize:
+                enum_object['localize'] = {locale: localize[locale]} if locale in localize else None
+        return object_list
+
+    def _bulk_payload(self, names: Tuple[str, ...], locale: Optional[str]) -> Tuple[bytes, str]:
+        """Payload of many enums joined from encoded ones, they are valid json already"""
+        bulk_payload = self._bulk_payloads.get((names, locale))
+        if bulk_payload is not None:
+            return bulk_payload
+
+        payloads = [self._payloads[name, locale] for name in names]
+        body = b'{' + b','.join(_encode(name) + b':' + payload for name, (payload, _) in zip(names, payloads)) + b'}'
+        bulk_payload = body, _etag(*[name.encode() + etag.encode() for name, (_, etag) in zip(names, payloads)])
+        if len(self._bulk_payloads) < MAX_BULK_PAYLOADS:
+            self._bulk_payloads[names, locale] = bulk_payload
+        return bulk_payload
+
+    def _check_locale(self, locale: Optional[str]) -> None:
+        if locale is not ALL_LOCALES and locale not in self.locales:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Unknown locale')
+
+    def _response(self, request: Request, etag: str, body: Callable[[], bytes]) -> Response:
+        """Response with cache headers, body is built only if client has no actual version"""
+        headers = {'ETag': etag, 'Cache-Control': self.cache_control}
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match:
+            tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            if etag in tags or '*' in tags:
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=body(), media_type='application/json', headers=headers)
+
+    async def get_enum(self, request: Request, name: str, locale: Optional[str] = None) -> Response:
+        """Object list of single enum"""
+        self._check_locale(locale)
+        if name not in self.enums:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Unknown enum')
+        body, etag = self._payloads[name, locale]
+        return self._response(request, etag, lambda: body)
+
+    async def get_enums(
+            self,
+            request: Request,
+            names: Optional[List[str]] = Query(None),
+            locale: Optional[str] = None
+    ) -> Response:
+        """Object lists of many enums by enum name"""
+        self._check_locale(locale)
+        names = tuple(dict.fromkeys(names)) if names else tuple(self.enums)
+        unknown = [name for name in names if name not in self.enums]
+        if unknown:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f'Unknown enums: {unknown}')
+
+        body, etag = self._bulk_payload(names, locale)
+        return self._response(request, etag, lambda: body)
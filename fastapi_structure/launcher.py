@@ -0,0 +1,81 @@
+import gc
+import os
+from logging import getLogger
+
+from gunicorn.app.base import BaseApplication
+from gunicorn.util import import_app
+
+from fastapi_structure.utils import WorkerConfig
+from fastapi_structure.workers import (
+    WORKERS_ENV,
+    available_cpus,
+    freeze,
+    preload_catalogs
+)
+
+logger = getLogger()
+
+
+def pre_fork(server, worker) -> None:
+    """Gunicorn hook, freeze objects created since preloading"""
+    freeze()
+
+
+def post_fork(server, worker) -> None:
+    """Gunicorn hook, gc was disabled in master to keep preloaded objects untouched"""
+    gc.enable()
+
+
+class ServiceApplication(BaseApplication):
+    """
+    Gunicorn application with uvicorn workers and preloading before fork
+    Enums, exceptions and app (with its enum router payloads) are loaded
+    once in master, objects are frozen for copy on write sharing by workers.
+    uvicorn --workers spawns workers without fork, so it can not share them.
+
+    Worker count is in WEB_CONCURRENCY env for every worker,
+    connector pools with total_connections are sized by it
+
+    Using:
+        if __name__ == '__main__':
+            run('service.main:app', WorkerConfig(preload=['service.enums', 'service.exceptions']))
+    """
+
+    def __init__(self, app: str, config: WorkerConfig):
+        self.app = app
+        self.config = config
+        self.workers = config.workers if config.workers else available_cpus()
+        super().__init__()
+
+    def load_config(self) -> None:
+        options = {
+            'bind': self.config.bind,
+            'workers': self.workers,
+            'worker_class': self.config.worker_class,
+            'timeout': self.config.timeout,
+            'graceful_timeout': self.config.graceful_timeout,
+            'max_requests': self.config.max_requests,
+            'preload_app': True,
+            'pre_fork': pre_fork,
+            'post_fork': post_fork,
+        }
+        for key, value in options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # set before app import, app factory sizes connector pools by it
+        os.environ[WORKERS_ENV] = str(self.workers)
+        # garbage of imports so far is collected once,
+        # objects created while loading should not be moved by gc before freeze
+        gc.collect()
+        gc.disable()
+        preload_catalogs(self.config.preload)
+        app = import_app(self.app)
+        freeze()
+        logger.info(f'Preloaded {self.app} for {self.workers} workers, {gc.get_freeze_count()} objects frozen')
+        return app
+
+
+def run(app: str, config: WorkerConfig) -> None:
+    """Run app in gunicorn with uvicorn workers"""
+    ServiceApplication(app, config).run()
@@ -0,0 +1,279 @@
+import io
+import time
+import inspect
+import random
+import pstats
+import cProfile
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from functools import partial, wraps
+from logging import getLogger
+from typing import Callable, ContextManager, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from api_connector.connector import AsyncInternalAPIConnector
+from localized_exceptions.hooks import exception_timer_var
+
+logger = getLogger()
+
+# upper bounds of histogram buckets in seconds, last bucket is for everything slower
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONNECTOR = 'connector'
+EXCEPTIONS = 'exceptions'
+
+
+class RequestTimings:
+    """
+    Wall time by category for single request
+    Nested and concurrent sections of one category are counted once
+    """
+
+    def __init__(self):
+        self.totals: Dict[str, float] = dict()
+        self._active: Dict[str, int] = dict()
+        self._started: Dict[str, float] = dict()
+
+    def enter(self, category: str) -> None:
+        active = self._active.get(category, 0)
+        if not active:
+            self._started[category] = time.perf_counter()
+        self._active[category] = active + 1
+
+    def exit(self, category: str) -> None:
+        active = self._active[category] - 1
+        self._active[category] = active
+        if not active:
+            self.totals[category] = (
+                self.totals.get(category, 0.0) + time.perf_counter() - self._started[category]
+            )
+
+
+# set by TimingMiddleware for each request, tasks share it
+request_timings_var: ContextVar[Optional[RequestTimings]] = ContextVar('request_timings', default=None)
+
+
+class _RecordTime:
+    __slots__ = ('category', 'timings')
+
+    def __init__(self, category: str, timings: RequestTimings):
+        self.category = category
+        self.timings = timings
+
+    def __enter__(self) -> None:
+        self.timings.enter(self.category)
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.timings.exit(self.category)
+
+
+_no_timings = nullcontext()
+
+
+def record_time(category: str) -> ContextManager[None]:
+    """Add time spent inside the block to the current request timings, does nothing without them"""
+    timings = request_timings_var.get()
+    if timings is None:
+        return _no_timings
+    return _RecordTime(category, timings)
+
+
+class ProfileRecord(BaseModel):
+    """Profile of slow request"""
+    method: str
+    route: str
+    duration: float  # seconds
+    timings: Dict[str, float]  # seconds by category, ex: {'connector': 0.1}
+    profile: str  # pstats report sorted by cumulative time
+
+
+ProfileSink = Callable[[ProfileRecord], None]
+
+
+def logging_profile_sink(record: ProfileRecord) -> None:
+    """Default sink, writes profile to log"""
+    logger.warning(
+        f'Slow request {record.method} {record.route} {record.duration:.3f}s '
+        f'{record.timings}\n{record.profile}'
+    )
+
+
+class LatencyHistogram:
+    """Latency histogram with fixed buckets"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'total': self.total,
+            'buckets': dict(zip([*map(str, self.buckets), 'inf'], self.counts))
+        }
+
+
+class TimingStats:
+    """Latency histograms by route and time category"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.histograms: Dict[Tuple[str, str], Dict[str, LatencyHistogram]] = dict()
+
+    def observe(self, method: str, route: str, duration: float, timings: Dict[str, float]) -> None:
+        histograms = self.histograms.get((method, route))
+        if histograms is None:
+            histograms = self.histograms[method, route] = dict()
+        for category, seconds in (('total', duration), *timings.items()):
+            histogram = histograms.get(category)
+            if histogram is None:
+                histogram = histograms[category] = LatencyHistogram(self.buckets)
+            histogram.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, dict]]:
+        """Histograms as dict, ex: {'GET /enums': {'total': {...}, 'connector': {...}}}"""
+        return {
+            f'{method} {route}': {
+                category: histogram.to_dict()
+                for category, histogram in histograms.items()
+            }
+            for (method, route), histograms in self.histograms.items()
+        }
+
+
+def timed(category: str, func: Callable) -> Callable:
+    """Wrap function or coroutine function to record its time in category"""
+    if getattr(func, '__timed__', False):
+        return func
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with record_time(category):
+                return await func(*args, **kwargs)
+    else:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with record_time(category):
+                return func(*args, **kwargs)
+    wrapper.__timed__ = True
+    return wrapper
+
+
+def instrument_connector(connector: AsyncInternalAPIConnector) -> AsyncInternalAPIConnector:
+    """
+    Record time of connector requests for the current request
+    get_file calls get, so it is not wrapped
+    """
+    for method in ('get', 'post', 'put', 'delete'):
+        setattr(connector, method, timed(CONNECTOR, getattr(connector, method)))
+    return connector
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware with per route latency histograms and slow requests profiler
+
+    Time of instrumented connectors (see instrument_connector) and localized
+    exceptions is attributed to its category as wall time, so parallel
+    connector calls in one request are counted once.
+    Share of requests from profile_sample_rate runs under cProfile, profiles
+    of requests slower than slow_threshold are sent to profile_sink.
+    With zero sample rate no profiler is started.
+
+    cProfile sees the whole thread, so profile may have other requests
+    running at the same time. Only one request is profiled at a time.
+
+    Using:
+        stats = TimingStats()
+        app.add_middleware(TimingMiddleware, stats=stats, profile_sample_rate=0.01)
+    """
+
+    def __init__(
+            self,
+            app,
+            *,
+            stats: TimingStats,
+            slow_threshold: float = 1.0,
+            profile_sample_rate: float = 0.0,
+            profile_sink: ProfileSink = logging_profile_sink,
+            profile_limit: int = 30
+    ):
+        self.app = app
+        self.stats = stats
+        self.slow_threshold = slow_threshold
+        self.profile_sample_rate = profile_sample_rate
+        self.profile_sink = profile_sink
+        self.profile_limit = profile_limit
+        self._profiling = False
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_timings = RequestTimings()
+        token = request_timings_var.set(request_timings)
+        # localized exceptions do not depend on profiling, they time their work with this hook
+        exception_token = exception_timer_var.set(partial(_RecordTime, EXCEPTIONS, request_timings))
+        profiler = self._start_profiler()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            duration = time.perf_counter() - start
+            if profiler:
+                profiler.disable()
+                self._profiling = False
+            request_timings_var.reset(token)
+            exception_timer_var.reset(exception_token)
+            timings = request_timings.totals
+
+            route = scope.get('route')
+            route = route.path if hasattr(route, 'path') else '<unmatched>'
+            self.stats.observe(scope['method'], route, duration, timings)
+            if profiler and duration >= self.slow_threshold:
+                self._export_profile(profiler, scope['method'], route, duration, timings)
+
+    def _start_profiler(self) -> Optional[cProfile.Profile]:
+        if not self.profile_sample_rate or self._profiling or random.random() >= self.profile_sample_rate:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # another profiler is active
+            return None
+        self._profiling = True
+        return profiler
+
+    def _export_profile(
+            self,
+            profiler: cProfile.Profile,
+            method: str,
+            route: str,
+            duration: float,
+            timings: Dict[str, float]
+    ) -> None:
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(self.profile_limit)
+        try:
+            self.profile_sink(
+                ProfileRecord(
+                    method=method,
+                    route=route,
+                    duration=duration,
+                    timings=timings,
+                    profile=stream.getvalue()
+                )
+            )
+        except Exception:  # noqa sink must not break requests
+            logger.exception('Profile sink failed')
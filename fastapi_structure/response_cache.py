@@ -0,0 +1,462 @@
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from logging import getLogger
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
+
+logger = getLogger()
+
+# requests with these headers may get per user responses
+PRIVATE_REQUEST_HEADERS = (b'authorization', b'cookie')
+PRIVATE_CACHE_CONTROL = {'private', 'no-store'}
+
+
+class CachePolicy(NamedTuple):
+    """Cache policy of endpoint"""
+    ttl: float  # seconds while response is fresh
+    stale_ttl: float  # seconds after ttl while stale response is served and revalidated
+    tags: Tuple[str, ...]  # tags for invalidation, can use path params, ex: 'product:{product_id}'
+    vary: Tuple[str, ...]  # request headers in cache key
+
+
+class CacheEntry(NamedTuple):
+    """Cached response"""
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+    created: float
+    ttl: float
+    stale_ttl: float
+
+
+def cached(
+        *,
+        ttl: float = 60,
+        stale_ttl: float = 0,
+        tags: Iterable[str] = (),
+        vary: Iterable[str] = ('accept-language',),
+) -> Callable:
+    """
+    Mark endpoint for ResponseCacheMiddleware
+    Cache key is route, path, query params (with locale) and vary headers
+
+    Using:
+        @app.get('/products/{product_id}')
+        @cached(ttl=60, stale_ttl=600, tags=['products', 'product:{product_id}'])
+        async def get_product(product_id: int, locale: str = 'EN'):
+            ...
+
+        # after product update, blocking backends (sqlite) are run in threadpool
+        backend = app.state.response_cache
+        if backend.blocking:
+            await run_in_threadpool(backend.invalidate_tags, [f'product:{product_id}'])
+        else:
+            backend.invalidate_tags([f'product:{product_id}'])
+    """
+    policy = CachePolicy(
+        ttl=ttl,
+        stale_ttl=stale_ttl,
+        tags=tuple(tags),
+        vary=tuple(header.lower() for header in vary)
+    )
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__response_cache__ = policy
+        return endpoint
+    return decorator
+
+
+class CacheBackend(ABC):
+    """
+    Base class for response cache storages
+    Calls of blocking backends are run by middleware in threadpool
+    """
+    blocking = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Entry by key, None is a cache miss"""
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry, tags: Iterable[str]) -> None:
+        """Store entry, may skip it if storage is busy"""
+
+    @abstractmethod
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        """Remove all entries with any of tags"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In process LRU cache, every worker has its own
+    Safe to use from sync endpoints running in threadpool
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Tuple[CacheEntry, Tuple[str, ...]]]' = OrderedDict()
+        self._tags: Dict[str, Set[str]] = dict()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            self._entries.move_to_end(key)
+            return item[0]
+
+    def set(self, key: str, entry: CacheEntry, tags: Iterable[str]) -> None:
+        tags = tuple(tags)
+        with self._lock:
+            self._delete(key)
+            self._entries[key] = entry, tags
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._delete(next(iter(self._entries)))
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    self._delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _delete(self, key: str) -> None:
+        # called under lock
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        for tag in item[1]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class SqliteCacheBackend(CacheBackend):
+    """
+    Cache in sqlite file shared by all workers on host,
+    place it in /dev/shm to keep it in shared memory
+
+    Expired entries are removed on write, at most once in cleanup_interval seconds.
+    Reads and writes wait for locks of other workers busy_timeout seconds at most,
+    then they are a cache miss or skipped write. Invalidation waits invalidate_timeout
+    and raises sqlite3.OperationalError on timeout, so stale data is not kept silently.
+    """
+    blocking = True
+
+    def __init__(
+            self,
+            path: str,
+            cleanup_interval: float = 60,
+            busy_timeout: float = 0.05,
+            invalidate_timeout: float = 5
+    ):
+        self.path = path
+        self.cleanup_interval = cleanup_interval
+        self.busy_timeout = busy_timeout
+        self.invalidate_timeout = invalidate_timeout
+        self._local = threading.local()
+        self._last_cleanup = 0.0
+        connection = self._connection(self.invalidate_timeout)
+        connection.executescript('''
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                created REAL NOT NULL,
+                ttl REAL NOT NULL,
+                stale_ttl REAL NOT NULL,
+                expires REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS tags (
+                tag TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (tag, key)
+            );
+            CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires);
+        ''')
+
+    def _connection(self, timeout: float) -> sqlite3.Connection:
+        # sqlite connections can not be shared between threads
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path, isolation_level=None)
+            connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute(f'PRAGMA busy_timeout={int(timeout * 1000)}')
+        return connection
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            row = self._connection(self.busy_timeout).execute(
+                'SELECT status, headers, body, created, ttl, stale_ttl FROM entries WHERE key = ? AND expires > ?',
+                (key, time.time())
+            ).fetchone()
+        except sqlite3.OperationalError as exc:
+            logger.debug(f'Response cache read skipped: {exc}')
+            return None
+        if row is None:
+            return None
+        status, headers, body, created, ttl, stale_ttl = row
+        return CacheEntry(
+            status=status,
+            headers=[tuple(header) for header in json.loads(headers)],
+            body=body,
+            created=created,
+            ttl=ttl,
+            stale_ttl=stale_ttl
+        )
+
+    def set(self, key: str, entry: CacheEntry, tags: Iterable[str]) -> None:
+        try:
+            self._set(key, entry, tags)
+        except sqlite3.OperationalError as exc:
+            logger.debug(f'Response cache write skipped: {exc}')
+
+    def _set(self, key: str, entry: CacheEntry, tags: Iterable[str]) -> None:
+        connection = self._connection(self.busy_timeout)
+        with connection:
+            connection.execute('BEGIN')
+            connection.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    key, entry.status, json.dumps(entry.headers), entry.body, entry.created,
+                    entry.ttl, entry.stale_ttl, entry.created + entry.ttl + entry.stale_ttl
+                )
+            )
+            connection.executemany('INSERT OR IGNORE INTO tags VALUES (?, ?)', [(tag, key) for tag in tags])
+            if entry.created - self._last_cleanup > self.cleanup_interval:
+                self._last_cleanup = entry.created
+                connection.execute('DELETE FROM entries WHERE expires <= ?', (entry.created,))
+                connection.execute('DELETE FROM tags WHERE key NOT IN (SELECT key FROM entries)')
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        tags = list(tags)
+        if not tags:
+            return
+        placeholders = ','.join('?' * len(tags))
+        connection = self._connection(self.invalidate_timeout)
+        with connection:
+            connection.execute('BEGIN')
+            connection.execute(
+                f'DELETE FROM entries WHERE key IN (SELECT key FROM tags WHERE tag IN ({placeholders}))', tags
+            )
+            connection.execute(f'DELETE FROM tags WHERE tag IN ({placeholders})', tags)
+
+    def clear(self) -> None:
+        connection = self._connection(self.invalidate_timeout)
+        with connection:
+            connection.execute('BEGIN')
+            connection.execute('DELETE FROM entries')
+            connection.execute('DELETE FROM tags')
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware caching GET responses of endpoints marked with cached decorator
+    Only complete 200 responses without Set-Cookie and private or no-store
+    Cache-Control are cached. Requests with Authorization or Cookie headers
+    bypass cache, unless these headers are in vary of the endpoint.
+
+    Stale responses are served while one background request per key
+    revalidates them, so clients do not wait for recomputing.
+
+    Using:
+        backend = MemoryCacheBackend()
+        app.add_middleware(ResponseCacheMiddleware, backend=backend)
+    """
+
+    def __init__(self, app, *, backend: CacheBackend, max_body_size: int = 1024 * 1024):
+        self.app = app
+        self.backend = backend
+        self.max_body_size = max_body_size
+        self._routes: Optional[list] = None
+        self._revalidating: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            await self.app(scope, receive, send)
+            return
+
+        matched = self._match(scope)
+        if matched is None:
+            await self.app(scope, receive, send)
+            return
+
+        route, policy, path_params = matched
+        # set for outer middlewares, cached responses do not reach the router
+        scope['route'] = route
+        headers = dict(scope['headers'])
+        if any(header in headers for header in PRIVATE_REQUEST_HEADERS if header.decode() not in policy.vary):
+            await self.app(scope, receive, send)
+            return
+
+        key = self._key(scope, headers, route.path, policy)
+        entry = await self._backend_call(self.backend.get, key)
+        if entry is not None:
+            age = time.time() - entry.created
+            if age < entry.ttl:
+                await self._send_entry(send, entry, b'hit')
+                return
+            if age < entry.ttl + entry.stale_ttl:
+                if key not in self._revalidating:
+                    self._revalidate(scope, key, policy, path_params)
+                await self._send_entry(send, entry, b'stale')
+                return
+
+        await self._call_and_store(scope, receive, send, key, policy, path_params)
+
+    def _match(self, scope) -> Optional[tuple]:
+        if self._routes is None:
+            # endpoints are marked on import, so routes are collected once
+            self._routes = [
+                (route, route.endpoint.__response_cache__)
+                for route in scope['app'].routes
+                if hasattr(getattr(route, 'endpoint', None), '__response_cache__')
+            ]
+        for route, policy in self._routes:
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return route, policy, child_scope.get('path_params', {})
+        return None
+
+    async def _backend_call(self, func, *args):
+        if self.backend.blocking:
+            return await run_in_threadpool(func, *args)
+        return func(*args)
+
+    @staticmethod
+    def _key(scope, headers: Dict[bytes, bytes], route_path: str, policy: CachePolicy) -> str:
+        parts = [
+            route_path.encode(),
+            scope['path'].encode(),
+            b'&'.join(sorted(scope['query_string'].split(b'&'))),
+            *[headers.get(header.encode(), b'') for header in policy.vary]
+        ]
+        return hashlib.blake2b(b'\x00'.join(parts), digest_size=16).hexdigest()
+
+    @staticmethod
+    async def _send_entry(send, entry: CacheEntry, cache_status: bytes) -> None:
+        headers = [(name.encode('latin-1'), value.encode('latin-1')) for name, value in entry.headers]
+        headers.append((b'x-cache', cache_status))
+        await send({'type': 'http.response.start', 'status': entry.status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': entry.body})
+
+    async def _call_and_store(
+            self,
+            scope,
+            receive,
+            send,
+            key: str,
+            policy: CachePolicy,
+            path_params: dict,
+            finished: Optional[asyncio.Event] = None
+    ) -> None:
+        start_message = None
+        chunks: List[bytes] = []
+        size = 0
+
+        async def send_wrapper(message) -> None:
+            nonlocal start_message, size
+            if message['type'] == 'http.response.start':
+                start_message = message
+            elif message['type'] == 'http.response.body' and size <= self.max_body_size:
+                chunks.append(message.get('body', b''))
+                size += len(chunks[-1])
+            if message['type'] != 'http.response.body' or message.get('more_body', False):
+                await send(message)
+                return
+            # entry is written before the response completes, so next requests of client hit it
+            await self._store(key, policy, path_params, start_message, b''.join(chunks))
+            await send(message)
+            if finished is not None:
+                finished.set()
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _store(self, key: str, policy: CachePolicy, path_params: dict, start_message, body: bytes) -> None:
+        if start_message is None or start_message['status'] != 200 or len(body) > self.max_body_size:
+            return
+        headers = [
+            (name.decode('latin-1'), value.decode('latin-1'))
+            for name, value in start_message.get('headers', ())
+        ]
+        for name, value in headers:
+            name = name.lower()
+            # per user responses must not be served to other clients
+            if name == 'set-cookie':
+                return
+            if name == 'cache-control' and PRIVATE_CACHE_CONTROL & {
+                directive.split('=')[0].strip().lower() for directive in value.split(',')
+            }:
+                return
+        try:
+            tags = [tag.format(**path_params) for tag in policy.tags]
+        except (KeyError, IndexError):
+            logger.warning(f'Bad response cache tags {policy.tags} for {path_params}')
+            return
+        await self._backend_call(
+            self.backend.set,
+            key,
+            CacheEntry(
+                status=start_message['status'],
+                headers=headers,
+                body=body,
+                created=time.time(),
+                ttl=policy.ttl,
+                stale_ttl=policy.stale_ttl
+            ),
+            tags
+        )
+
+    def _revalidate(self, scope, key: str, policy: CachePolicy, path_params: dict) -> None:
+        self._revalidating.add(key)
+        finished = asyncio.Event()
+        requested = False
+
+        async def receive():
+            # streaming responses listen for disconnect, it comes after the body like from a real client
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await finished.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(_) -> None:
+            pass
+
+        async def revalidate() -> None:
+            try:
+                await self._call_and_store(dict(scope), receive, send, key, policy, path_params, finished)
+            except Exception:  # noqa stale entry stays until it expires
+                logger.exception('Response cache revalidation failed')
+            finally:
+                finished.set()
+                self._revalidating.discard(key)
+
+        task = asyncio.ensure_future(revalidate())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,70 @@
+import pytest
+from fastapi import Depends, status
+from fastapi.testclient import TestClient
+
+from api_connector.connector import AsyncInternalAPIConnector
+from fastapi_structure.app import create_app, get_connector
+from fastapi_structure.utils import AppConfig, ConnectorConfig
+from localized_exceptions.localized_exception import UserListHttpException
+from localized_exceptions.utils import UserExceptionTypeEnum, ProductExceptionEnum
+
+
+@pytest.fixture()
+def app():
+    app = create_app(
+        AppConfig(
+            connectors=[
+                ConnectorConfig(name='places', host='places'),
+                ConnectorConfig(name='products', host='products', port=8000),
+            ],
+            warmup=False
+        )
+    )
+
+    @app.get('/connector/{name}')
+    async def connector_id(
+            name: str,
+            places: AsyncInternalAPIConnector = Depends(get_connector('places')),
+            products: AsyncInternalAPIConnector = Depends(get_connector('products'))
+    ):
+        connector = places if name == 'places' else products
+        return {'id': id(connector), 'url': connector._url, 'is_open': connector.is_open}
+
+    @app.get('/errors')
+    async def errors():
+        user_errors = UserListHttpException(status_code=status.HTTP_400_BAD_REQUEST)
+        user_errors.add_detail(
+            value=1,
+            exception_type=UserExceptionTypeEnum.VALIDATION,
+            loc=['category_id'],
+            error_key=ProductExceptionEnum.CATEGORY_NOT_FOUND
+        )
+        raise user_errors
+
+    return app
+
+
+def test_connectors_shared_between_requests(app):
+    with TestClient(app) as client:
+        first = client.get('/connector/places').json()
+        second = client.get('/connector/places').json()
+        products = client.get('/connector/products').json()
+
+    assert first['is_open']
+    assert first['id'] == second['id']
+    assert first['url'] == 'http://places'
+    assert products['url'] == 'http://products:8000'
+
+
+def test_connectors_closed_on_shutdown(app):
+    with TestClient(app):
+        assert all(connector.is_open for connector in app.state.connectors.values())
+    assert not any(connector.is_open for connector in app.state.connectors.values())
+
+
+def test_user_list_exception_handler(app):
+    with TestClient(app) as client:
+        response = client.get('/errors')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()['detail'][0]['loc'] == ['category_id']
+    assert response.json()['detail'][0]['localize']['EN'] == 'Product category not found'
@@ -0,0 +1,63 @@
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from fastapi_structure.enum_router import LocalizedEnumRouter
+from localized_exceptions.utils import UserExceptionTypeEnum, ProductExceptionEnum
+
+
+@pytest.fixture()
+def client():
+    app = FastAPI()
+    app.include_router(LocalizedEnumRouter(enums=[UserExceptionTypeEnum, ProductExceptionEnum]))
+    return TestClient(app)
+
+
+def test_get_enum(client):
+    response = client.get('/enums/ProductExceptionEnum')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == ProductExceptionEnum.to_object_list()
+    assert response.headers['etag']
+    assert response.headers['cache-control'] == 'public, max-age=3600'
+
+
+def test_get_enum_locale(client):
+    response = client.get('/enums/ProductExceptionEnum', params={'locale': 'EN'})
+    assert response.json()[0]['localize'] == {'EN': ProductExceptionEnum.NO_PRODUCT.localize['EN']}
+    assert response.headers['etag'] != client.get('/enums/ProductExceptionEnum').headers['etag']
+
+
+def test_get_enum_not_found(client):
+    assert client.get('/enums/Unknown').status_code == status.HTTP_404_NOT_FOUND
+    assert client.get(
+        '/enums/ProductExceptionEnum', params={'locale': 'XX'}
+    ).status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_get_enum_not_modified(client):
+    etag = client.get('/enums/ProductExceptionEnum').headers['etag']
+    response = client.get('/enums/ProductExceptionEnum', headers={'If-None-Match': etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not response.content
+    assert response.headers['etag'] == etag
+
+
+def test_get_enums_bulk(client):
+    response = client.get('/enums', params={'names': ['ProductExceptionEnum'], 'locale': 'RU'})
+    assert list(response.json()) == ['ProductExceptionEnum']
+    localize = response.json()['ProductExceptionEnum'][1]['localize']
+    assert localize['RU']['title'] == 'Не найдена категория для продукта'
+
+    response = client.get('/enums')
+    assert response.json() == {
+        'UserExceptionTypeEnum': UserExceptionTypeEnum.to_object_list(),
+        'ProductExceptionEnum': ProductExceptionEnum.to_object_list(),
+    }
+    not_modified = client.get('/enums', headers={'If-None-Match': response.headers['etag']})
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_duplicate_enum_name():
+    duplicate = type(ProductExceptionEnum.__name__, (), {})
+    with pytest.raises(ValueError):
+        LocalizedEnumRouter(enums=[ProductExceptionEnum, duplicate])
@@ -0,0 +1,94 @@
+import time
+import asyncio
+
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from fastapi_structure.app import create_app
+from api_connector.connector import AsyncInternalAPIConnector
+from fastapi_structure.profiling import (
+    TimingMiddleware,
+    TimingStats,
+    ProfileRecord,
+    RequestTimings,
+    instrument_connector,
+    record_time,
+    request_timings_var,
+    CONNECTOR
+)
+from fastapi_structure.utils import AppConfig, ProfilingConfig
+from localized_exceptions.localized_exception import UserHttpException, UserListHttpException
+from localized_exceptions.utils import UserExceptionTypeEnum, ProductExceptionEnum
+
+
+def test_timing_middleware_histograms():
+    stats = TimingStats()
+    app = FastAPI()
+    app.add_middleware(TimingMiddleware, stats=stats)
+
+    @app.get('/items/{item_id}')
+    async def get_item(item_id: int):
+        with record_time(CONNECTOR):
+            time.sleep(0.01)
+        return {'id': item_id}
+
+    client = TestClient(app)
+    client.get('/items/1')
+    client.get('/items/2')
+    client.get('/unknown')
+
+    snapshot = stats.snapshot()
+    assert snapshot['GET /items/{item_id}']['total']['count'] == 2
+    assert snapshot['GET /items/{item_id}'][CONNECTOR]['total'] >= 0.02
+    assert snapshot['GET <unmatched>']['total']['count'] == 1
+
+
+def test_slow_request_profile():
+    records = []
+    app = create_app(
+        AppConfig(profiling=ProfilingConfig(slow_threshold=0.0, profile_sample_rate=1.0)),
+        profile_sink=records.append
+    )
+
+    @app.get('/error')
+    async def error():
+        raise UserHttpException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            value='value',
+            exception_type=UserExceptionTypeEnum.VALIDATION,
+            error_key=ProductExceptionEnum.NO_PRODUCT
+        )
+
+    with TestClient(app) as client:
+        assert client.get('/error').status_code == status.HTTP_404_NOT_FOUND
+
+    assert len(records) == 1
+    assert isinstance(records[0], ProfileRecord)
+    assert records[0].route == '/error'
+    assert records[0].timings['exceptions'] > 0
+    assert 'function calls' in records[0].profile
+    assert app.state.timing_stats.snapshot()['GET /error']['exceptions']['count'] == 1
+
+    assert not hasattr(UserListHttpException.add_detail, '__timed__')
+
+
+def test_concurrent_connector_calls_counted_once():
+    connector = AsyncInternalAPIConnector(host='places')
+
+    async def get(*args, **kwargs):
+        with record_time(CONNECTOR):
+            await asyncio.sleep(0.05)
+
+    connector.get = get
+    instrument_connector(connector)
+    assert 'get_file' not in vars(connector)
+
+    async def request():
+        request_timings = RequestTimings()
+        request_timings_var.set(request_timings)
+        start = time.perf_counter()
+        await asyncio.gather(connector.get('/a'), connector.get('/b'))
+        return request_timings.totals, time.perf_counter() - start
+
+    timings, duration = asyncio.run(request())
+    assert 0.05 <= timings[CONNECTOR] <= duration
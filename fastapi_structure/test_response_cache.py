@@ -0,0 +1,180 @@
+import time
+import sqlite3
+
+import pytest
+from fastapi import status, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from fastapi_structure.app import create_app
+from fastapi_structure.response_cache import cached, CacheEntry, MemoryCacheBackend, SqliteCacheBackend
+from fastapi_structure.utils import AppConfig, ProfilingConfig, ResponseCacheConfig
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def app(request, tmp_path):
+    path = str(tmp_path / 'cache.db') if request.param == 'sqlite' else None
+    app = create_app(AppConfig(
+        response_cache=ResponseCacheConfig(path=path),
+        profiling=ProfilingConfig()
+    ))
+    app.state.calls = 0
+
+    @app.get('/products/{product_id}')
+    @cached(ttl=60, tags=['products', 'product:{product_id}'])
+    async def get_product(product_id: int, locale: str = 'EN'):
+        app.state.calls += 1
+        return {'id': product_id, 'locale': locale, 'calls': app.state.calls}
+
+    @app.get('/stale')
+    @cached(ttl=0, stale_ttl=60)
+    async def get_stale():
+        app.state.calls += 1
+        return {'calls': app.state.calls}
+
+    @app.get('/stale_stream')
+    @cached(ttl=0, stale_ttl=60)
+    async def get_stale_stream():
+        app.state.calls += 1
+
+        async def body():
+            yield b'{"calls":'
+            yield str(app.state.calls).encode() + b'}'
+        return StreamingResponse(body(), media_type='application/json')
+
+    @app.get('/ping')
+    async def ping():
+        return {}
+
+    @app.get('/private')
+    @cached(ttl=60)
+    async def get_private(response: Response, private: bool = False):
+        app.state.calls += 1
+        if private:
+            response.headers['Cache-Control'] = 'private, max-age=60'
+        else:
+            response.set_cookie('session', 'user')
+        return {'calls': app.state.calls}
+
+    @app.get('/not_cached')
+    async def not_cached():
+        app.state.calls += 1
+        return {'calls': app.state.calls}
+
+    return app
+
+
+def test_cache_hit(app):
+    with TestClient(app) as client:
+        first = client.get('/products/1')
+        second = client.get('/products/1')
+        other_locale = client.get('/products/1', params={'locale': 'RU'})
+
+    assert first.json() == second.json() == {'id': 1, 'locale': 'EN', 'calls': 1}
+    assert 'x-cache' not in first.headers
+    assert second.headers['x-cache'] == 'hit'
+    assert other_locale.json()['calls'] == 2
+
+
+def test_cache_hit_route_stats(app):
+    with TestClient(app) as client:
+        client.get('/products/1')
+        assert client.get('/products/1').headers['x-cache'] == 'hit'
+
+    snapshot = app.state.timing_stats.snapshot()
+    assert snapshot['GET /products/{product_id}']['total']['count'] == 2
+    assert 'GET <unmatched>' not in snapshot
+
+
+def test_private_response_not_cached(app):
+    with TestClient(app) as client:
+        client.get('/private')
+        assert client.get('/private').json()['calls'] == 2
+        client.get('/private', params={'private': True})
+        assert client.get('/private', params={'private': True}).json()['calls'] == 4
+
+
+def test_authorized_request_bypass(app):
+    with TestClient(app) as client:
+        client.get('/products/1')
+        response = client.get('/products/1', headers={'Authorization': 'Bearer token'})
+        assert 'x-cache' not in response.headers
+        assert response.json()['calls'] == 2
+        assert client.get('/products/1').json()['calls'] == 1
+
+
+def test_not_cached_endpoint(app):
+    with TestClient(app) as client:
+        client.get('/not_cached')
+        assert client.get('/not_cached').json()['calls'] == 2
+
+
+def test_cache_invalidate_tags(app):
+    with TestClient(app) as client:
+        client.get('/products/1')
+        client.get('/products/2')
+        app.state.response_cache.invalidate_tags(['product:1'])
+        assert client.get('/products/1').json()['calls'] == 3
+        assert client.get('/products/2').json()['calls'] == 2
+        app.state.response_cache.invalidate_tags(['products'])
+        assert client.get('/products/2').json()['calls'] == 4
+
+
+def test_stale_while_revalidate(app):
+    with TestClient(app) as client:
+        assert client.get('/stale').json()['calls'] == 1
+        stale = client.get('/stale')
+        assert stale.headers['x-cache'] == 'stale'
+        assert stale.json()['calls'] == 1
+        # revalidated in background after stale response
+        for _ in range(100):
+            if app.state.calls == 2:
+                break
+            time.sleep(0.01)
+        assert app.state.calls == 2
+        assert client.get('/stale').json()['calls'] == 2
+
+
+def test_stale_while_revalidate_streaming(app):
+    with TestClient(app) as client:
+        assert client.get('/stale_stream').json()['calls'] == 1
+        assert client.get('/stale_stream').headers['x-cache'] == 'stale'
+        # streaming response waits for disconnect while revalidated, loop must not be blocked
+        assert client.get('/ping').status_code == status.HTTP_200_OK
+        for _ in range(100):
+            if app.state.calls == 2:
+                break
+            time.sleep(0.01)
+        assert app.state.calls == 2
+        assert client.get('/stale_stream').json()['calls'] == 2
+
+
+def test_memory_backend_lru():
+    backend = MemoryCacheBackend(max_size=2)
+    entry = CacheEntry(status=200, headers=[], body=b'{}', created=0, ttl=1, stale_ttl=0)
+    backend.set('a', entry, ['tag'])
+    backend.set('b', entry, ['tag'])
+    backend.get('a')
+    backend.set('c', entry, [])
+    assert backend.get('a') and backend.get('c')
+    assert backend.get('b') is None
+    backend.invalidate_tags(['tag'])
+    assert backend.get('a') is None and backend.get('c')
+
+
+def test_sqlite_backend_busy(tmp_path):
+    backend = SqliteCacheBackend(str(tmp_path / 'cache.db'), busy_timeout=0.01, invalidate_timeout=0.01)
+    entry = CacheEntry(status=200, headers=[], body=b'{}', created=time.time(), ttl=60, stale_ttl=0)
+    backend.set('a', entry, ['tag'])
+
+    # writer of other worker, WAL readers are not blocked by it
+    lock = sqlite3.connect(backend.path, isolation_level=None)
+    lock.execute('BEGIN IMMEDIATE')
+    try:
+        backend.set('b', entry, [])
+        with pytest.raises(sqlite3.OperationalError):
+            backend.invalidate_tags(['tag'])
+        assert backend.get('a')
+    finally:
+        lock.execute('ROLLBACK')
+    assert backend.get('b') is None
@@ -0,0 +1,72 @@
+import gc
+import os
+import warnings
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from gunicorn.util import load_class
+
+from fastapi_structure.app import create_app, create_connector
+from fastapi_structure.launcher import ServiceApplication
+from fastapi_structure.utils import AppConfig, ConnectorConfig, WorkerConfig
+from fastapi_structure.workers import WORKERS_ENV, available_cpus, per_worker, preload_catalogs
+from localized_exceptions.utils import ProductExceptionEnum
+
+# imported by launcher in test_service_application
+launcher_app = FastAPI()
+
+
+@pytest.fixture()
+def app():
+    return create_app(AppConfig(worker_stats_path='/worker/stats'))
+
+
+def test_per_worker(monkeypatch):
+    monkeypatch.setenv(WORKERS_ENV, '4')
+    assert per_worker(100) == 25
+    assert per_worker(3) == 1
+    assert per_worker(100, workers=3) == 33
+
+
+def test_connector_pool_per_worker(monkeypatch):
+    monkeypatch.setenv(WORKERS_ENV, '8')
+    connector = create_connector(ConnectorConfig(name='places', host='places', total_connections=80))
+    assert connector.limits.max_connections == 10
+    assert connector.limits.max_keepalive_connections == 10
+
+
+def test_preload_catalogs():
+    assert ProductExceptionEnum in preload_catalogs(['localized_exceptions.utils'])
+
+
+def test_service_application(monkeypatch):
+    # load sets it for workers, monkeypatch restores it after test
+    monkeypatch.setenv(WORKERS_ENV, '1')
+    application = ServiceApplication(
+        'fastapi_structure.test_workers:launcher_app',
+        WorkerConfig(preload=['localized_exceptions.utils'])
+    )
+    assert application.cfg.workers == available_cpus()
+    assert application.cfg.preload_app
+    try:
+        assert application.load() is launcher_app
+        assert gc.get_freeze_count()
+        assert os.environ[WORKERS_ENV] == str(available_cpus())
+    finally:
+        gc.unfreeze()
+        gc.enable()
+
+
+def test_worker_stats(app):
+    with TestClient(app) as client:
+        stats = client.get('/worker/stats').json()
+    assert stats['rss'] > 0
+    assert stats['workers'] >= 1
+    assert stats['connectors'] == {}
+
+
+def test_default_worker_class():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', DeprecationWarning)
+        assert load_class(WorkerConfig().worker_class)
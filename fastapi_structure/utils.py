@@ -0,0 +1,56 @@
+from typing import Optional, List
+
+from pydantic import BaseModel, PositiveInt, PositiveFloat, NonNegativeInt
+
+from api_connector.utils import ProtocolTypeEnum
+
+
+class ConnectorConfig(BaseModel):
+    """Config for shared AsyncInternalAPIConnector"""
+    name: str  # name for dependency injection, ex: get_connector('places')
+    host: str
+    protocol: ProtocolTypeEnum = ProtocolTypeEnum.HTTP
+    port: Optional[int] = None
+    http2: bool = True
+    request_timeout: int = 30
+    max_connections: Optional[PositiveInt] = 100
+    max_keepalive_connections: Optional[PositiveInt] = 20
+    total_connections: Optional[PositiveInt] = None  # budget for all workers, overrides max_connections
+    warmup_path: str = '/'
+    warmup_connections: NonNegativeInt = 1  # 0 disables warmup, 1 with http2 over HTTPS
+    warmup_timeout: PositiveFloat = 2  # seconds, startup does not wait full request_timeout
+
+
+class ProfilingConfig(BaseModel):
+    """Config for request timing middleware"""
+    slow_threshold: float = 1.0  # seconds
+    profile_sample_rate: float = 0.0  # 0 disables profiler
+    profile_limit: PositiveInt = 30  # functions in profile report
+
+
+class ResponseCacheConfig(BaseModel):
+    """Config for response cache middleware"""
+    max_size: PositiveInt = 1024  # entries of in memory cache
+    path: Optional[str] = None  # sqlite file shared by workers instead of in memory cache, ex: /dev/shm/cache.db
+    max_body_size: PositiveInt = 1024 * 1024
+
+
+class WorkerConfig(BaseModel):
+    """Config for multi process launcher"""
+    bind: str = '0.0.0.0:8000'
+    workers: Optional[PositiveInt] = None  # CPUs available to the process by default
+    preload: List[str] = []  # modules with enums and exceptions to import before fork
+    worker_class: str = 'uvicorn_worker.UvicornWorker'
+    timeout: PositiveInt = 30
+    graceful_timeout: PositiveInt = 30
+    max_requests: NonNegativeInt = 0  # restart worker after requests, 0 disables
+
+
+class AppConfig(BaseModel):
+    """Config for application factory"""
+    title: str = 'FastAPI'
+    connectors: List[ConnectorConfig] = []
+    warmup: bool = True
+    profiling: Optional[ProfilingConfig] = None
+    response_cache: Optional[ResponseCacheConfig] = None
+    worker_stats_path: Optional[str] = None  # route with resource stats of worker, ex: /worker/stats
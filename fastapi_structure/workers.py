@@ -0,0 +1,142 @@
+import gc
+import os
+import math
+import resource
+import importlib
+from logging import getLogger
+from typing import Dict, Iterable, List, Optional, Type
+
+from pydantic import BaseModel
+
+from api_connector.connector import AsyncInternalAPIConnector
+from localized_enum.localized_enum import LocalizedEnum
+
+logger = getLogger()
+
+# worker count env, read by gunicorn and uvicorn too
+WORKERS_ENV = 'WEB_CONCURRENCY'
+
+
+class ConnectorStatsSchema(BaseModel):
+    """Connection pool of connector in worker"""
+    is_open: bool
+    max_connections: Optional[int] = None
+    max_keepalive_connections: Optional[int] = None
+
+
+class WorkerStatsSchema(BaseModel):
+    """Resource usage of worker process"""
+    pid: int
+    workers: int
+    rss: int  # bytes
+    pss: Optional[int] = None  # bytes, proportional share of pages shared with other workers
+    shared: Optional[int] = None  # bytes, pages shared with other processes
+    private: Optional[int] = None  # bytes, pages copied or created by worker
+    cpu_user: float  # seconds
+    cpu_system: float  # seconds
+    gc_frozen: int  # objects frozen before fork
+    gc_counts: List[int]
+    connectors: Dict[str, ConnectorStatsSchema] = dict()
+
+
+def available_cpus() -> int:
+    """CPUs available to the process with affinity and cgroup v2 quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not linux
+        cpus = os.cpu_count() or 1
+
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def current_workers() -> int:
+    """Number of workers started by launcher"""
+    try:
+        return max(1, int(os.environ.get(WORKERS_ENV, 1)))
+    except ValueError:
+        return 1
+
+
+def per_worker(total: int, workers: Optional[int] = None) -> int:
+    """Share of total budget for single worker, at least 1"""
+    return max(1, total // (workers or current_workers()))
+
+
+def _subclasses(cls: type) -> Iterable[type]:
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _subclasses(subclass)
+
+
+def preload_catalogs(modules: Iterable[str]) -> List[Type[LocalizedEnum]]:
+    """
+    Import modules with enums and exceptions, so their localization
+    is built once in master process and shared by workers after fork
+    """
+    for module in modules:
+        importlib.import_module(module)
+    catalogs = list(_subclasses(LocalizedEnum))
+    logger.info(f'Preloaded {len(catalogs)} localized enums')
+    return catalogs
+
+
+def freeze() -> None:
+    """
+    Move all objects to permanent gc generation before fork,
+    gc in workers does not touch them and shared pages are not copied.
+    No collect here, freed objects would leave holes in shared pages for workers to fill
+    """
+    gc.freeze()
+
+
+def _memory() -> Dict[str, int]:
+    # linux only, values in kB
+    memory = dict()
+    try:
+        with open('/proc/self/smaps_rollup') as smaps:
+            for line in smaps:
+                name, _, value = line.partition(':')
+                if value.strip().endswith('kB'):
+                    memory[name] = int(value.split()[0]) * 1024
+    except OSError:
+        pass
+    return memory
+
+
+def worker_stats(connectors: Optional[Dict[str, AsyncInternalAPIConnector]] = None) -> WorkerStatsSchema:
+    """Resource usage of current worker"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    memory = _memory()
+    shared = None
+    private = None
+    if 'Shared_Clean' in memory:
+        shared = memory['Shared_Clean'] + memory.get('Shared_Dirty', 0)
+        private = memory.get('Private_Clean', 0) + memory.get('Private_Dirty', 0)
+    return WorkerStatsSchema(
+        pid=os.getpid(),
+        workers=current_workers(),
+        # ru_maxrss is peak in kB, used when smaps are not available
+        rss=memory.get('Rss', usage.ru_maxrss * 1024),
+        pss=memory.get('Pss'),
+        shared=shared,
+        private=private,
+        cpu_user=usage.ru_utime,
+        cpu_system=usage.ru_stime,
+        gc_frozen=gc.get_freeze_count(),
+        gc_counts=list(gc.get_count()),
+        connectors={
+            name: ConnectorStatsSchema(
+                is_open=connector.is_open,
+                max_connections=connector.limits.max_connections if connector.limits else None,
+                max_keepalive_connections=connector.limits.max_keepalive_connections if connector.limits else None
+            )
+            for name, connector in (connectors or dict()).items()
+        }
+    )
@@ -0,0 +1,64 @@
+"""
+LocalizedEnum converters benchmarks, need pytest-benchmark
+
+Sizes are close to real reference data (10 - 1k members),
+peak memory is tracked with tracemalloc and checked against per member budget
+
+Runs only with --benchmark-only, regression threshold is in root conftest
+"""
+import pytest
+
+from localized_enum.localized_enum import LocalizedEnum
+from localized_enum.utils import LocalizeSchema
+
+MEMBER_SIZES = [10, 100, 1_000]
+
+# peak allocated bytes per enum member, measured values are about two times lower
+MEMORY_BUDGET_PER_MEMBER = 8192
+
+
+def make_enum(size: int):
+    return LocalizedEnum(
+        f'BenchEnum{size}',
+        [
+            (f'MEMBER_{x}', (f'MEMBER_{x}', {
+                "EN": LocalizeSchema(title=f'Member {x}', short_title=f'M{x}'),
+                "RU": LocalizeSchema(title=f'Элемент {x}', short_title=f'Э{x}'),
+            }))
+            for x in range(size)
+        ]
+    )
+
+
+@pytest.mark.parametrize('size', MEMBER_SIZES)
+def test_benchmark_to_object_list(benchmark, peak_memory, size):
+    enum_class = make_enum(size)
+    benchmark.extra_info['peak_memory'] = peak_memory(enum_class.to_object_list)
+    assert benchmark.extra_info['peak_memory'] < MEMORY_BUDGET_PER_MEMBER * size
+
+    object_list = benchmark(enum_class.to_object_list)
+    assert len(object_list) == size
+
+
+@pytest.mark.parametrize('size', MEMBER_SIZES)
+def test_benchmark_to_schema_list(benchmark, peak_memory, size):
+    enum_class = make_enum(size)
+    benchmark.extra_info['peak_memory'] = peak_memory(enum_class.to_schema_list)
+    assert benchmark.extra_info['peak_memory'] < MEMORY_BUDGET_PER_MEMBER * size
+
+    schema_list = benchmark(enum_class.to_schema_list)
+    assert len(schema_list) == size
+
+
+@pytest.mark.parametrize('size', MEMBER_SIZES)
+def test_benchmark_member_schema(benchmark, peak_memory, size):
+    enum_class = make_enum(size)
+
+    def member_schemas():
+        return [member.schema for member in enum_class]
+
+    benchmark.extra_info['peak_memory'] = peak_memory(member_schemas)
+    assert benchmark.extra_info['peak_memory'] < MEMORY_BUDGET_PER_MEMBER * size
+
+    schemas = benchmark(member_schemas)
+    assert len(schemas) == size
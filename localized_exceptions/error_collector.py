@@ -0,0 +1,141 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional, Dict, List, Union, Type, Tuple, Iterator
+
+from localized_enum.localized_enum import LocalizedEnum
+from localized_exceptions.localized_exception import UserListHttpException
+from localized_exceptions.hooks import timer_hook
+from localized_exceptions.utils import (
+    UserExceptionTypeEnum,
+    UserExceptionSchema,
+    trusted_dict_to_schema
+)
+
+_errors_var: ContextVar[Optional[List[UserExceptionSchema]]] = ContextVar('user_errors', default=None)
+_path_var: ContextVar[Tuple[Any, ...]] = ContextVar('user_errors_path', default=())
+
+
+class UserErrorCollector:
+    """
+    Context scoped collector for user localized errors
+    Errors can be added from any coroutine or task started inside the collector,
+    raises UserListHttpException once on exit if any errors were collected
+
+    Using:
+        with UserErrorCollector(status_code=status.HTTP_400_BAD_REQUEST):
+            with error_path('items', 0):
+                add_error(
+                    value=item.category_id,
+                    exception_type=UserExceptionTypeEnum.VALIDATION,
+                    loc=['category_id'],
+                    error_key=ProductExceptionEnum.CATEGORY_NOT_FOUND
+                )
+            await asyncio.gather(validate_price(item), validate_stock(item))
+    """
+
+    def __init__(
+            self,
+            status_code: int,
+            headers: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.status_code = status_code
+        self.headers = headers
+        self.detail: List[UserExceptionSchema] = list()
+        self._errors_token = None
+        self._path_token = None
+
+    def __enter__(self) -> 'UserErrorCollector':
+        # tasks copy the context on creation, so they share the same list object
+        self._errors_token = _errors_var.set(self.detail)
+        self._path_token = _path_var.set(())
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        _errors_var.reset(self._errors_token)
+        _path_var.reset(self._path_token)
+        # do not hide exceptions raised inside the block
+        if exc_type is None and self.detail:
+            raise self.to_exception()
+
+    def to_exception(self) -> UserListHttpException:
+        """Build prepared exception from collected errors"""
+        exception = UserListHttpException(
+            status_code=self.status_code,
+            detail=self.detail,
+            headers=self.headers
+        )
+        exception.prepare_exception()
+        return exception
+
+    def get_details(self) -> List[UserExceptionSchema]:
+        """Return all details"""
+        return self.detail
+
+
+def _get_errors() -> List[UserExceptionSchema]:
+    errors = _errors_var.get()
+    if errors is None:
+        raise RuntimeError('No active UserErrorCollector in current context')
+    return errors
+
+
+@contextmanager
+def error_path(*path: Any) -> Iterator[None]:
+    """Add path items to the beginning of loc for errors added inside the block"""
+    token = _path_var.set(_path_var.get() + path)
+    try:
+        yield
+    finally:
+        _path_var.reset(token)
+
+
+@timer_hook
+def add_error(
+        *,
+        value: Any,
+        exception_type: UserExceptionTypeEnum,
+        loc: Optional[List[Any]] = None,
+        error_key: Type[LocalizedEnum],
+) -> None:
+    """Add single detail to the active collector with current path"""
+    _get_errors().append(
+        UserExceptionSchema(
+            value=value,
+            type=exception_type,
+            loc=[*_path_var.get(), *(loc or ())],
+            localize=error_key.plain_localize  # noqa strange ide message for property
+        )
+    )
+
+
+@timer_hook
+def merge_errors(
+        *,
+        detail: Union[List[UserExceptionSchema], List[dict]],
+        path_pre: Optional[list] = None,
+        trusted: bool = False
+) -> None:
+    """
+    Merge detail list to the active collector with current path and optional prefix
+    Dict details from trusted sources are converted in one fast pass
+    """
+    if not detail or not isinstance(detail, list):
+        return
+
+    # if we get errors from http request they might be dicts
+    if all(isinstance(x, dict) for x in detail):
+        if trusted:
+            detail = trusted_dict_to_schema(detail=detail)
+        else:
+            detail = [UserExceptionSchema(**record) for record in detail]
+
+    path = [*_path_var.get(), *(path_pre or ())]
+    if path:
+        for error in detail:
+            error.loc = path + error.loc
+    _get_errors().extend(detail)
+
+
+def has_errors() -> bool:
+    """Check if the active collector already has errors"""
+    return bool(_get_errors())
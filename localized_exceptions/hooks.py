@@ -0,0 +1,20 @@
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, ContextManager, Optional
+
+# set by request profilers (ex: fastapi_structure TimingMiddleware), entered around exception work
+exception_timer_var: ContextVar[Optional[Callable[[], ContextManager[None]]]] = ContextVar(
+    'exception_timer', default=None
+)
+
+
+def timer_hook(func: Callable) -> Callable:
+    """Run func inside exception timer of current context, plain call without it"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        timer = exception_timer_var.get()
+        if timer is None:
+            return func(*args, **kwargs)
+        with timer():
+            return func(*args, **kwargs)
+    return wrapper
@@ -4,7 +4,12 @@ from fastapi.encoders import jsonable_encoder
 from fastapi import HTTPException
 
 from localized_enum.localized_enum import LocalizedEnum
-from localized_exceptions.utils import UserExceptionTypeEnum, UserExceptionSchema
+from localized_exceptions.hooks import timer_hook
+from localized_exceptions.utils import (
+    UserExceptionTypeEnum,
+    UserExceptionSchema,
+    trusted_dict_to_schema
+)
 
 
 class UserHttpException(HTTPException):
@@ -12,6 +17,7 @@ class UserHttpException(HTTPException):
     Class for user localized error
     Raise like common HTTPException
     """
+    @timer_hook
     def __init__(
             self,
             status_code: int,
@@ -46,6 +52,7 @@ class UserListHttpException(HTTPException):
         self.headers = headers
         self.detail = detail if detail else list()
 
+    @timer_hook
     def add_detail(
             self, *,
             value: Any,
@@ -74,20 +81,28 @@ class UserListHttpException(HTTPException):
             ) for record in detail
         ]
 
+    @timer_hook
     def merge_details(
             self, *,
             detail: Union[List[UserExceptionSchema], List[dict]],
             path_pre: Union[str, list, None] = None,
-            path_post: Union[str, list, None] = None
+            path_post: Union[str, list, None] = None,
+            trusted: bool = False
     ) -> None:
-        """Merge detail list to error list with option to add path prefix and postfix"""
+        """
+        Merge detail list to error list with option to add path prefix and postfix
+        Dict details from trusted sources are converted in one fast pass
+        """
 
         if not detail or not isinstance(detail, list):
             return
 
         # if we get errors from http request they might be dicts
         if all(isinstance(x, dict) for x in detail):
-            detail = self.__dict_to_schema(detail=detail)
+            if trusted:
+                detail = trusted_dict_to_schema(detail=detail)
+            else:
+                detail = self.__dict_to_schema(detail=detail)
 
         if path_pre:
             # add additional path to the beginning of each merged error
@@ -112,6 +127,7 @@ class UserListHttpException(HTTPException):
         """Return all details"""
         return self.detail
 
+    @timer_hook
     def prepare_exception(self) -> Optional[list]:
         """Prepare exception for proper raise"""
         super().__init__(
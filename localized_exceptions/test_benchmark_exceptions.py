@@ -0,0 +1,138 @@
+"""
+Error path benchmarks, need pytest-benchmark
+
+Sizes are close to real validation payloads (1 - 100k errors),
+peak memory is tracked with tracemalloc and checked against per error budget
+
+Runs only with --benchmark-only, regression threshold is in root conftest
+"""
+import pytest
+from fastapi import status
+from fastapi.responses import JSONResponse
+
+from localized_exceptions.localized_exception import (
+    UserHttpException,
+    UserListHttpException
+)
+from localized_exceptions.utils import (
+    UserExceptionTypeEnum,
+    UserExceptionSchema, ProductExceptionEnum
+)
+
+ERROR_SIZES = [1, 1_000, 100_000]
+
+# peak allocated bytes per error, measured values are about two times lower
+MEMORY_BUDGET_PER_ERROR = 4096
+
+
+def run_benchmark(benchmark, peak_memory, func, size: int, setup=None):
+    """Run func with fewer rounds on big sizes and save peak memory to report"""
+    if setup:
+        args, kwargs = setup()
+        benchmark.extra_info['peak_memory'] = peak_memory(func, *args, **kwargs)
+    else:
+        benchmark.extra_info['peak_memory'] = peak_memory(func)
+    assert benchmark.extra_info['peak_memory'] < MEMORY_BUDGET_PER_ERROR * size + 1024 * 1024
+
+    if size >= 10_000:
+        return benchmark.pedantic(func, setup=setup, rounds=3)
+    if setup:
+        return benchmark.pedantic(func, setup=setup, rounds=100)
+    return benchmark(func)
+
+
+def error_dicts(size: int) -> list:
+    return [
+        {
+            'value': x,
+            'type': UserExceptionTypeEnum.VALIDATION.value,
+            'loc': ['items', x, 'category_id'],
+            'localize': ProductExceptionEnum.CATEGORY_NOT_FOUND.plain_localize
+        } for x in range(size)
+    ]
+
+
+def error_schemas(size: int) -> list:
+    return [
+        UserExceptionSchema(
+            value=x,
+            type=UserExceptionTypeEnum.VALIDATION,
+            loc=['items', x, 'category_id'],
+            localize=ProductExceptionEnum.CATEGORY_NOT_FOUND.plain_localize
+        ) for x in range(size)
+    ]
+
+
+def test_benchmark_user_exception_to_response(benchmark, peak_memory):
+    def raise_to_response():
+        try:
+            raise UserHttpException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                value='value',
+                exception_type=UserExceptionTypeEnum.VALIDATION,
+                loc=['category_id'],
+                error_key=ProductExceptionEnum.NO_PRODUCT
+            )
+        except UserHttpException as exc:
+            # same as default fastapi http exception handler
+            return JSONResponse(status_code=exc.status_code, content={'detail': exc.detail})
+
+    response = run_benchmark(benchmark, peak_memory, raise_to_response, 1)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.parametrize('size', ERROR_SIZES)
+def test_benchmark_add_detail(benchmark, peak_memory, size):
+    def add_details():
+        errors = UserListHttpException(status_code=status.HTTP_400_BAD_REQUEST)
+        for x in range(size):
+            errors.add_detail(
+                value=x,
+                exception_type=UserExceptionTypeEnum.VALIDATION,
+                loc=['items', x, 'category_id'],
+                error_key=ProductExceptionEnum.CATEGORY_NOT_FOUND
+            )
+        return errors
+
+    errors = run_benchmark(benchmark, peak_memory, add_details, size)
+    assert len(errors.get_details()) == size
+
+
+@pytest.mark.parametrize('trusted', [False, True])
+@pytest.mark.parametrize('size', ERROR_SIZES)
+def test_benchmark_merge_details_dicts(benchmark, peak_memory, size, trusted):
+    def setup():
+        return (UserListHttpException(status_code=status.HTTP_400_BAD_REQUEST), error_dicts(size)), {}
+
+    def merge_details(errors, detail):
+        errors.merge_details(detail=detail, path_pre=['body', 'order'], trusted=trusted)
+        return errors
+
+    errors = run_benchmark(benchmark, peak_memory, merge_details, size, setup=setup)
+    assert len(errors.get_details()) == size
+
+
+@pytest.mark.parametrize('size', ERROR_SIZES)
+def test_benchmark_merge_details_schemas(benchmark, peak_memory, size):
+    def setup():
+        return (UserListHttpException(status_code=status.HTTP_400_BAD_REQUEST), error_schemas(size)), {}
+
+    def merge_details(errors, detail):
+        errors.merge_details(detail=detail, path_pre='body')
+        return errors
+
+    errors = run_benchmark(benchmark, peak_memory, merge_details, size, setup=setup)
+    assert len(errors.get_details()) == size
+
+
+@pytest.mark.parametrize('size', ERROR_SIZES)
+def test_benchmark_prepare_exception(benchmark, peak_memory, size):
+    def setup():
+        return (UserListHttpException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_schemas(size)),), {}
+
+    def prepare_exception(errors):
+        errors.prepare_exception()
+        return errors
+
+    errors = run_benchmark(benchmark, peak_memory, prepare_exception, size, setup=setup)
+    assert len(errors.detail) == size
@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import contextmanager
+
 import pytest
 from fastapi import status
 
@@ -5,6 +8,13 @@ from localized_exceptions.localized_exception import (
     UserHttpException,
     UserListHttpException
 )
+from localized_exceptions.hooks import exception_timer_var
+from localized_exceptions.error_collector import (
+    UserErrorCollector,
+    add_error,
+    error_path,
+    merge_errors
+)
 from localized_exceptions.utils import (
     UserExceptionTypeEnum,
     UserExceptionSchema, ProductExceptionEnum
@@ -52,3 +62,73 @@ def test_user_exception_list_merge_details(exception_schema):
     assert errors.get_details()[0].value == status.HTTP_404_NOT_FOUND
     assert errors.get_details()[0].localize["EN"] == "Product not found"
     assert errors.get_details()[0].loc[0] == "something"
+
+
+def test_error_collector_raise_on_exit():
+    with pytest.raises(UserListHttpException) as exc_info:
+        with UserErrorCollector(status_code=status.HTTP_400_BAD_REQUEST):
+            with error_path('items', 0):
+                add_error(
+                    value=status.HTTP_404_NOT_FOUND,
+                    exception_type=UserExceptionTypeEnum.VALIDATION,
+                    loc=['category_id'],
+                    error_key=ProductExceptionEnum.CATEGORY_NOT_FOUND
+                )
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+    assert exc_info.value.detail[0]['loc'] == ['items', 0, 'category_id']
+    assert exc_info.value.detail[0]['localize']["EN"] == "Product category not found"
+
+
+def test_error_collector_without_errors():
+    with UserErrorCollector(status_code=status.HTTP_400_BAD_REQUEST) as errors:
+        pass
+    assert not errors.get_details()
+
+
+def test_error_collector_concurrent_tasks(exception_schema):
+    async def validate(index: int):
+        with error_path('items', index):
+            await asyncio.sleep(0)
+            add_error(
+                value=index,
+                exception_type=UserExceptionTypeEnum.VALIDATION,
+                loc=['category_id'],
+                error_key=ProductExceptionEnum.CATEGORY_NOT_FOUND
+            )
+
+    async def validate_all():
+        with UserErrorCollector(status_code=status.HTTP_400_BAD_REQUEST):
+            with error_path('body'):
+                await asyncio.gather(*[validate(x) for x in range(3)])
+                merge_errors(detail=[exception_schema])
+
+    with pytest.raises(UserListHttpException) as exc_info:
+        asyncio.run(validate_all())
+    locs = sorted(error['loc'] for error in exc_info.value.detail[:3])
+    assert locs == [['body', 'items', x, 'category_id'] for x in range(3)]
+    assert exc_info.value.detail[3]['loc'] == ['body', 'category_id']
+
+
+def test_exception_timer_hook():
+    entered = []
+
+    @contextmanager
+    def timer():
+        entered.append(True)
+        yield
+
+    errors = UserListHttpException(status_code=status.HTTP_400_BAD_REQUEST)
+    errors.add_detail(
+        value=1, exception_type=UserExceptionTypeEnum.VALIDATION, loc=[], error_key=ProductExceptionEnum.NO_PRODUCT
+    )
+    assert not entered
+
+    token = exception_timer_var.set(timer)
+    try:
+        errors.add_detail(
+            value=1, exception_type=UserExceptionTypeEnum.VALIDATION, loc=[], error_key=ProductExceptionEnum.NO_PRODUCT
+        )
+        errors.prepare_exception()
+    finally:
+        exception_timer_var.reset(token)
+    assert len(entered) == 2
@@ -3,6 +3,11 @@ from typing import Dict, List, Any
 
 from pydantic import BaseModel
 
+try:
+    from pydantic import TypeAdapter
+except ImportError:  # pydantic < 2
+    TypeAdapter = None
+
 from localized_enum.localized_enum import LocalizedEnum
 from localized_enum.utils import LocalizeSchema
 
@@ -37,3 +42,22 @@ class UserExceptionSchema(BaseModel):
     type: UserExceptionTypeEnum
     loc: List[Any]  # location of the error by names of model, ex: ['localize', 'EN', 'param']
     localize: Dict[str, str]  # error localization
+
+
+# pydantic 2 validates a whole list in its core faster than python side model construct
+_exception_list_adapter = TypeAdapter(List[UserExceptionSchema]) if TypeAdapter else None
+
+
+def trusted_dict_to_schema(detail: List[dict]) -> List[UserExceptionSchema]:
+    """Convert error dicts from trusted internal services to schemas in one pass"""
+    if _exception_list_adapter is not None:
+        return _exception_list_adapter.validate_python(detail)
+    # pydantic 1 has no fast validation, skip it for already validated errors
+    return [
+        UserExceptionSchema.construct(
+            value=record.get('value'),
+            type=record.get('type'),
+            loc=record.get('loc') or list(),
+            localize=record.get('localize')
+        ) for record in detail
+    ]